@@ -484,6 +484,12 @@ class APIServer(BaseHTTPRequestHandler):
         factor = data.get("upscale_factor", 2)
         output_format = data.get("output_format", "PNG").upper()
         metadata = bool(data.get("metadata", False))
+        webp_effort = data.get("webp_effort", upscale_manager.DEFAULT_WEBP_EFFORT)
+        upscaler_precision = data.get("upscaler_precision")
+        try:
+            upscale_manager.resolve_upscaler_bits(upscaler_precision)
+        except ValueError as exc:
+            return _bad_request(self, str(exc))
 
         try:
             temp_path = _save_temp_image(img)
@@ -492,6 +498,8 @@ class APIServer(BaseHTTPRequestHandler):
                 upscale_factor=factor,
                 output_format=output_format,
                 metadata=metadata,
+                webp_effort=webp_effort,
+                upscaler_precision=upscaler_precision,
             )
         except Exception as exc:  # noqa: BLE001
             return _bad_request(self, f"Upscale failed: {exc}", status=500)
@@ -580,6 +588,17 @@ class APIServer(BaseHTTPRequestHandler):
                 ).to_dict()
             }, status=400)
 
+        if job_type == JobType.upscale:
+            try:
+                upscale_manager.resolve_upscaler_bits(data.get("upscaler_precision"))
+            except ValueError as exc:
+                return _json_response(self, {
+                    "error": APIError(
+                        code=APIError.INVALID_PARAM,
+                        message=str(exc),
+                    ).to_dict()
+                }, status=400)
+
         mgr = get_job_manager()
         job = mgr.submit_job(job_type, data)
         return _json_response(self, {
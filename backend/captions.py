@@ -215,18 +215,14 @@ def clean_caption_output(text):
 
 def show_uploaded_images(uploaded_files):
     """Show uploaded images in the UI."""
+    files = (uploaded_files or [])[:20]
     updates = []
-    for i, f in enumerate(uploaded_files[:20]):
-        updates.extend([
-            gr.update(value=f.name, visible=True),   
-            gr.update(value="", visible=True) 
-        ])
-    
-    for _ in range(20 - len(uploaded_files[:20])):
-        updates.extend([
-            gr.update(value=None, visible=False),
-            gr.update(value="", visible=False)
-        ])
+    for i in range(20):
+        f = files[i] if i < len(files) else None
+        updates += [
+            gr.update(value=getattr(f, "name", None), visible=f is not None),
+            gr.update(value="", visible=f is not None)
+        ]
     return updates
 
 def fill_captions(uploaded_files, model_name, prompt_for_images):
@@ -5,7 +5,7 @@ from pathlib import Path
 import gradio as gr
 from huggingface_hub import HfApi, snapshot_download, hf_hub_download
 
-from backend.model_manager import CustomModelConfig, get_custom_model_config
+from backend.model_manager import CustomModelConfig, get_custom_model_config, invalidate_models_cache
 
 MODELS_DIR = "models"
 
@@ -101,6 +101,7 @@ def download_and_save_model(hf_model_name, alias, num_train_steps, max_sequence_
 
         model_dir = os.path.join(MODELS_DIR, alias)
         os.makedirs(model_dir, exist_ok=True)
+        invalidate_models_cache()
 
         downloaded_files = snapshot_download(
             repo_id=hf_model_name, 
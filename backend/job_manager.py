@@ -324,6 +324,10 @@ class JobManager:
         factor = params.get("upscale_factor", 2)
         output_format = params.get("output_format", "PNG").upper()
         metadata = bool(params.get("metadata", False))
+        webp_effort = params.get("webp_effort", upscale_manager.DEFAULT_WEBP_EFFORT)
+        upscaler_precision = params.get("upscaler_precision")
+        # Reject bad input before any work; a ValueError here fails the job up front
+        upscale_manager.resolve_upscaler_bits(upscaler_precision)
 
         import tempfile, os
         fd, path = tempfile.mkstemp(suffix=".png")
@@ -337,6 +341,8 @@ class JobManager:
             upscale_factor=factor,
             output_format=output_format,
             metadata=metadata,
+            webp_effort=webp_effort,
+            upscaler_precision=upscaler_precision,
         )
 
         if upscaled is None:
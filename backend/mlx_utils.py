@@ -1,4 +1,5 @@
 import gc
+import math
 import mlx.core as mx
 
 def force_mlx_cleanup():
@@ -26,4 +27,76 @@ def print_memory_usage(label):
         peak_memory = get_peak() / 1e6
         print(f"{label} - Active memory: {active_memory:.2f} MB, Peak memory: {peak_memory:.2f} MB")
     except Exception as e:
-        print(f"Error getting memory usage: {str(e)}") 
+        print(f"Error getting memory usage: {str(e)}")
+
+
+def _linear_kernel(x):
+    return mx.maximum(1.0 - mx.abs(x), 0.0)
+
+
+def _cubic_kernel(x, a=-0.5):
+    """Keys cubic convolution kernel (a=-0.5 matches PIL/OpenCV bicubic)."""
+    x = mx.abs(x)
+    x2 = x * x
+    x3 = x2 * x
+    near = (a + 2.0) * x3 - (a + 3.0) * x2 + 1.0
+    far = a * x3 - 5.0 * a * x2 + 8.0 * a * x - 4.0 * a
+    return mx.where(x <= 1.0, near, mx.where(x < 2.0, far, 0.0))
+
+
+_RESIZE_KERNELS = {
+    "bilinear": (_linear_kernel, 1.0),
+    "bicubic": (_cubic_kernel, 2.0),
+}
+
+
+def _resample_axis(arr, axis, out_size, kernel, support, dtype, start=0, stop=None):
+    """
+    Separable resample of `arr` along `axis` to `out_size` samples, computing only
+    outputs [start, stop). Weights are cast to `dtype`, which sets the result dtype.
+    """
+    in_size = arr.shape[axis]
+    stop = out_size if stop is None else stop
+    if in_size == out_size:
+        return mx.take(arr, mx.arange(start, stop), axis=axis).astype(dtype)
+
+    scale = in_size / out_size
+    # Widen the kernel when shrinking so the result is antialiased like PIL's.
+    filter_scale = max(scale, 1.0)
+    radius = support * filter_scale
+    centers = (mx.arange(start, stop, dtype=mx.float32) + 0.5) * scale - 0.5
+    first = mx.floor(centers - radius).astype(mx.int32) + 1
+
+    shape = [1] * arr.ndim
+    shape[axis] = stop - start
+
+    out = None
+    total = None
+    for tap in range(2 * int(math.ceil(radius)) + 1):
+        idx = first + tap
+        weight = kernel((idx.astype(mx.float32) - centers) / filter_scale)
+        sample = mx.take(arr, mx.clip(idx, 0, in_size - 1), axis=axis)
+        weighted = weight.astype(dtype).reshape(shape) * sample
+        out = weighted if out is None else out + weighted
+        total = weight if total is None else total + weight
+    return out / total.astype(dtype).reshape(shape)
+
+
+def mx_resize(arr, size, mode="bicubic", dtype=None, row_range=None):
+    """
+    Resize an (H, W, C) array to size=(height, width) on the MLX device.
+    Supports "bilinear" and "bicubic"; height and width are resampled separately.
+    `dtype` is the working/result dtype (default: arr's float dtype, else float32);
+    integer inputs are converted per tap, so no full-size float copy is made.
+    `row_range=(start, stop)` computes only those output rows, letting callers
+    bound peak memory by resizing in bands.
+    """
+    if mode not in _RESIZE_KERNELS:
+        raise ValueError(f"Unsupported resize mode: {mode}")
+    kernel, support = _RESIZE_KERNELS[mode]
+    if dtype is None:
+        dtype = arr.dtype if mx.issubdtype(arr.dtype, mx.floating) else mx.float32
+    height, width = size
+    start, stop = row_range if row_range is not None else (0, height)
+    arr = _resample_axis(arr, 0, height, kernel, support, dtype, start, stop)
+    return _resample_axis(arr, 1, width, kernel, support, dtype)
@@ -1,8 +1,9 @@
 import os
 import re
+import time
 from pathlib import Path
 from shutil import disk_usage
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import gradio as gr
 from huggingface_hub import HfApi, snapshot_download
@@ -15,6 +16,9 @@ from backend.mflux_compat import ModelConfig as MfluxModelConfig
 
 BASE_MODEL_CHOICES = ["flux2-klein-4b", "flux2-klein-9b"]
 MODELS: Dict[str, "CustomModelConfig"] = {}
+# Short-lived cache of get_updated_models() so repeated lookups skip the models/ scan.
+MODELS_CACHE_TTL = 5.0
+_models_cache: Optional[Tuple[float, List[str]]] = None
 
 
 class CustomModelConfig:
@@ -135,8 +139,28 @@ def _flux2_ordered() -> List[str]:
     ]
 
 
+def invalidate_models_cache() -> None:
+    """Forget cached model listings so the next lookup rescans models/."""
+    global _models_cache
+    _models_cache = None
+
+
 def get_updated_models(include_flux2: bool = True) -> List[str]:
-    """Combine official aliases with any folders under models/."""
+    """Combine official aliases with any folders under models/ (cached for a few seconds)."""
+    global _models_cache
+    # The listing does not depend on include_flux2, so one entry serves every caller.
+    cached = _models_cache
+    now = time.monotonic()
+    if cached is not None and now - cached[0] < MODELS_CACHE_TTL:
+        return list(cached[1])
+
+    models = _scan_models()
+    _models_cache = (now, models)
+    return list(models)
+
+
+def _scan_models() -> List[str]:
+    """Uncached listing: official aliases first, then custom folders under models/."""
     ordered = _flux2_ordered()
     ordered.append("seedvr2")
     predefined = [alias for alias in ordered if alias in MODELS]
@@ -200,6 +224,7 @@ def register_local_model(alias: str, model_name: str, base_arch: str, target_dir
         base_arch=base_arch,
         local_dir=target_dir,
     )
+    invalidate_models_cache()
     return get_model_choices()
 
 
@@ -307,6 +332,7 @@ def download_and_save_model(
             base_arch,
             local_dir=model_dir,
         )
+        invalidate_models_cache()
 
         model_choices = get_model_choices()
         print(f"Model {hf_model_name} successfully downloaded and saved as {alias}")
@@ -1,24 +1,60 @@
 import os
 import gc
+import math
+import numbers
 import time
+import atexit
+import concurrent.futures
+import contextlib
+import itertools
+import queue
+import re
 import random
+import threading
 import traceback
+from datetime import datetime
 import mlx.core as mx
 from PIL import Image
 import numpy as np
 from pathlib import Path
 import json
 import tempfile
+try:
+    import orjson
+except ModuleNotFoundError:  # pragma: no cover - optional dependency
+    orjson = None
 from backend.mflux_compat import Config, ModelConfig
-from backend.mlx_utils import force_mlx_cleanup, print_memory_usage
+from backend.mlx_utils import force_mlx_cleanup, mx_resize, print_memory_usage
 from backend.flux_manager import parse_scale_factor
 
 OUTPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "output")
 os.makedirs(OUTPUT_DIR, exist_ok=True)
+# Output paths are built by plain concatenation onto this prefix.
+_OUTPUT_DIR_B = OUTPUT_DIR + os.sep
+# (model, quantize bits) kept as one tuple so readers never pair a model with the wrong bits.
 _UPSCALE_MODEL = None
+# Held while loading and while generating, so a precision switch never evicts
+# a model another thread is still running.
+_UPSCALE_MODEL_LOCK = threading.RLock()
+# Set while a batch runs on this thread so per-image calls skip MLX cleanup.
+_in_batch = threading.local()
 UPSCALE_STEPS = int(os.getenv("MFLUX_UPSCALE_STEPS", "12"))
 UPSCALE_STRENGTH = float(os.getenv("MFLUX_UPSCALE_STRENGTH", "0.75"))
 UPSCALE_QUANTIZE = os.getenv("MFLUX_UPSCALE_QUANTIZE")
+# Output size budget in megapixels; larger requests shrink the input first (<= 0 disables).
+UPSCALE_MAX_MP = float(os.getenv("MFLUX_UPSCALE_MAX_MP", "64"))
+# Inputs larger than two tiles are upscaled tile by tile (input pixels; <= 0 disables).
+UPSCALE_TILE = int(os.getenv("MFLUX_UPSCALE_TILE", "512"))
+UPSCALE_TILE_OVERLAP = int(os.getenv("MFLUX_UPSCALE_TILE_OVERLAP", "32"))
+DEFAULT_WEBP_EFFORT = 4
+_SCALE_RE = re.compile(r"\s*(\d+(?:\.\d+)?)\s*[xX]?\s*")
+# Encoding a 4x image can take hundreds of ms; do it off the request thread.
+_IO_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="upscale-io")
+atexit.register(_IO_POOL.shutdown, wait=True)
+# Bounds pending saves so fast upscales cannot pile up image copies waiting on the encoder.
+_IO_SLOTS = threading.BoundedSemaphore(2)
+# Appended to output names so saves within the same second never share a path.
+_OUTPUT_SEQ = itertools.count()
 
 
 def _get_quantize_value():
@@ -30,90 +66,331 @@ def _get_quantize_value():
         return None
 
 
-def _get_upscale_model():
+def resolve_upscaler_bits(precision=None):
+    """
+    Map an upscaler precision ("fp16", "int8", "int4", 8, 4, ...) to mflux quantize bits.
+    None keeps the MFLUX_UPSCALE_QUANTIZE default.
+    """
+    if precision is None or precision == "":
+        return _get_quantize_value()
+    key = str(precision).strip().lower()
+    if key in ("fp16", "bf16", "16", "none"):
+        return None
+    key = key.removeprefix("int")
+    if key.isdigit() and int(key) in (3, 4, 5, 6, 8):
+        return int(key)
+    raise ValueError(f"Unsupported upscaler precision: {precision}")
+
+
+def _get_upscale_model(precision=None):
     """
     Lazily load the Flux ControlNet upscaler. Fails quietly and allows PIL fallback.
+    Quantized weights cut the memory traffic of every denoising step; asking for a
+    different precision than the cached instance reloads it. Callers that generate
+    with the result should go through `_using_upscale_model`.
     """
     global _UPSCALE_MODEL
-    if _UPSCALE_MODEL is not None:
-        return _UPSCALE_MODEL
-    try:
-        # Import lazily so environments without controlnet support still run with PIL fallback.
+    bits = resolve_upscaler_bits(precision)
+    with _UPSCALE_MODEL_LOCK:
+        # Another request may have finished loading while we waited on the lock.
+        cached = _UPSCALE_MODEL
+        if cached is not None and cached[1] == bits:
+            return cached[0]
+        if cached is not None:
+            # Only keep one precision resident
+            _UPSCALE_MODEL = None
+            force_mlx_cleanup()
         try:
-            from mflux.controlnet.flux_controlnet import Flux1Controlnet
-        except ModuleNotFoundError:
-            from mflux.models.flux.variants.controlnet.flux_controlnet import Flux1Controlnet  # type: ignore
-
-        _UPSCALE_MODEL = Flux1Controlnet(
-            model_config=ModelConfig.dev_controlnet_upscaler(),
-            quantize=_get_quantize_value(),
-            local_path=None,
-            lora_paths=None,
-            lora_scales=None,
-        )
-    except Exception as exc:  # noqa: BLE001
-        print(f"Upscaler unavailable, falling back to PIL resize: {exc}")
-        _UPSCALE_MODEL = None
-    return _UPSCALE_MODEL
+            # Import lazily so environments without controlnet support still run with PIL fallback.
+            try:
+                from mflux.controlnet.flux_controlnet import Flux1Controlnet
+            except ModuleNotFoundError:
+                from mflux.models.flux.variants.controlnet.flux_controlnet import Flux1Controlnet  # type: ignore
+
+            model = Flux1Controlnet(
+                model_config=ModelConfig.dev_controlnet_upscaler(),
+                quantize=bits,
+                local_path=None,
+                lora_paths=None,
+                lora_scales=None,
+            )
+            _UPSCALE_MODEL = (model, bits)
+            return model
+        except Exception as exc:  # noqa: BLE001
+            print(f"Upscaler unavailable, falling back to PIL resize: {exc}")
+            _UPSCALE_MODEL = None
+    return None
+
+@contextlib.contextmanager
+def _using_upscale_model(precision=None):
+    """
+    Yield the upscaler for `precision` (or None for the PIL fallback) and keep
+    it locked until the caller is done generating with it.
+    """
+    with _UPSCALE_MODEL_LOCK:
+        yield _get_upscale_model(precision)
+
+def _budget_shrink(width, height):
+    """
+    Factor (<= 1) that brings a width x height output within UPSCALE_MAX_MP megapixels.
+    """
+    output_mp = width * height / 1_000_000
+    if UPSCALE_MAX_MP <= 0 or output_mp <= UPSCALE_MAX_MP:
+        return 1.0
+    return math.sqrt(UPSCALE_MAX_MP / output_mp)
+
+def _fit_to_output_budget(image, upscale_factor):
+    """
+    Downscale `image` so that upscaling it by `upscale_factor` stays within
+    UPSCALE_MAX_MP output megapixels. Returns the image unchanged when it fits.
+    """
+    w, h = image.size
+    shrink = _budget_shrink(w * upscale_factor, h * upscale_factor)
+    if shrink >= 1.0:
+        return image
+    output_mp = w * h * upscale_factor ** 2 / 1_000_000
+    new_w = max(1, int(w * shrink))
+    new_h = max(1, int(h * shrink))
+    print(
+        f"Warning: {w}x{h} at {upscale_factor}x would be {output_mp:.1f} MP "
+        f"(limit {UPSCALE_MAX_MP:g} MP); resizing input to {new_w}x{new_h}"
+    )
+    return image.resize((new_w, new_h), Image.Resampling.LANCZOS)
+
+def _tile_layout(length, tile, overlap):
+    """
+    Split `length` into ceil(length / tile) equal windows spread evenly, with
+    neighbours sharing at least `overlap` pixels. Returns (starts, size).
+    """
+    if tile <= 0 or length <= tile:
+        return [0], length
+    overlap = max(0, min(overlap, tile // 2))
+    count = math.ceil(length / tile)
+    size = math.ceil((length + (count - 1) * overlap) / count)
+    # A multiple of 16 keeps size * factor on Flux's 16-pixel grid for every factor
+    size = min(length, -(-size // 16) * 16)
+    step = (length - size) / (count - 1)
+    return [round(i * step) for i in range(count)], size
+
+def _feather_mask(height, width, ramp):
+    """
+    (height, width, 1) weights rising linearly over `ramp` pixels from each edge.
+    """
+    def _axis(n):
+        idx = np.arange(n)
+        edge = np.minimum(idx + 1, n - idx).astype(np.float32)
+        return np.minimum(edge / (ramp + 1), 1.0) if ramp > 0 else np.ones(n, dtype=np.float32)
+    return np.minimum.outer(_axis(height), _axis(width))[..., None]
 
-def upscale_image(image_path, upscale_factor=2):
+def _tiled_upscale(pil_img, factor, upscaler, tile=UPSCALE_TILE, overlap=UPSCALE_TILE_OVERLAP, seed=None):
+    """
+    Upscale `pil_img` with the Flux upscaler one overlapping tile at a time and
+    feather the overlaps back together. Flux only ever sees one tile, so its
+    activations follow the tile size; the blend itself still needs a float32
+    output-sized accumulator plus weight plane (16 bytes per output pixel),
+    normalised in place so no further full-size float copies are made.
+    """
+    width, height = pil_img.size
+    seed = int(time.time()) if seed is None else seed
+    accum = np.zeros((height * factor, width * factor, 3), dtype=np.float32)
+    weights = np.zeros((height * factor, width * factor, 1), dtype=np.float32)
+
+    ys, tile_height = _tile_layout(height, tile, overlap)
+    xs, tile_width = _tile_layout(width, tile, overlap)
+    ramp = max(0, min(overlap, tile // 2)) * factor
+    for y in ys:
+        for x in xs:
+            box = (x, y, x + tile_width, y + tile_height)
+            tile_w = tile_width * factor
+            tile_h = tile_height * factor
+
+            # The controlnet pipeline reads its conditioning image from disk.
+            fd, tile_path = tempfile.mkstemp(suffix=".png")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pil_img.crop(box).save(f, format="PNG")
+                generated = upscaler.generate_image(
+                    seed=seed,
+                    prompt="High quality detailed image",
+                    controlnet_image_path=tile_path,
+                    config=Config(
+                        num_inference_steps=UPSCALE_STEPS,
+                        height=tile_h,
+                        width=tile_w,
+                        controlnet_strength=UPSCALE_STRENGTH,
+                    ),
+                )
+            finally:
+                try:
+                    os.remove(tile_path)
+                except OSError:
+                    pass
+
+            tile_out = generated.image.convert("RGB")
+            if tile_out.size != (tile_w, tile_h):
+                tile_out = tile_out.resize((tile_w, tile_h), Image.Resampling.LANCZOS)
+            mask = _feather_mask(tile_h, tile_w, ramp)
+            oy, ox = y * factor, x * factor
+            accum[oy:oy + tile_h, ox:ox + tile_w] += np.asarray(tile_out, dtype=np.float32) * mask
+            weights[oy:oy + tile_h, ox:ox + tile_w] += mask
+
+    np.divide(accum, weights, out=accum)
+    del weights
+    np.rint(accum, out=accum)
+    np.clip(accum, 0, 255, out=accum)
+    return Image.fromarray(accum.astype(np.uint8))
+
+def upscale_image(image_or_path, upscale_factor=2):
     """
     Upscale an image using a local resampling upscaler (LANCZOS).
+    Accepts an already-decoded PIL image or a path to one.
     """
-    image = Image.open(image_path).convert("RGB")
+    if isinstance(image_or_path, Image.Image):
+        image = image_or_path.convert("RGB") if image_or_path.mode != "RGB" else image_or_path
+    else:
+        image = Image.open(image_or_path).convert("RGB")
     w, h = image.size
     new_w = int(w * upscale_factor)
     new_h = int(h * upscale_factor)
     return image.resize((new_w, new_h), Image.Resampling.LANCZOS)
 
-def upscale_image_gradio(
-    input_image, upscale_factor, output_format, metadata
-):
+def _resize_on_device(pixels, size, band=256):
     """
-    Upscale an image using the Flux ControlNet upscaler when available,
-    falling back to high-quality PIL resize when not.
+    Bicubic-resize uint8 (H, W, 3) `pixels` to size=(width, height) with MLX.
+    Works in float16, `band` output rows at a time, so intermediates stay small
+    and only the uint8 source and result are full size.
+    """
+    width, height = size
+    out = np.empty((height, width, 3), dtype=np.uint8)
+    for top in range(0, height, band):
+        bottom = min(top + band, height)
+        rows = mx_resize(
+            pixels, (height, width), mode="bicubic", dtype=mx.float16, row_range=(top, bottom)
+        )
+        out[top:bottom] = np.array(mx.clip(mx.round(rows), 0, 255).astype(mx.uint8))
+    return Image.fromarray(out)
+
+def _parse_upscale_factor(upscale_factor, default=2):
+    """
+    Parse an upscale factor given as a number, "2", or "2x" into an int.
+    Empty values use `default`; unparseable ones return None so the caller's
+    range check rejects them. Range checks are left to callers.
+    """
+    if upscale_factor is None or upscale_factor == "":
+        return default
+    if isinstance(upscale_factor, numbers.Number):
+        return int(upscale_factor) if upscale_factor else default
+    if isinstance(upscale_factor, str):
+        if not upscale_factor.strip():
+            return default
+        match = _SCALE_RE.fullmatch(upscale_factor)
+        if match:
+            return int(float(match.group(1)))
+    return None
+
+def _cleanup_unless_batched():
+    """
+    Run gc + MLX cleanup, unless a batch on this thread will do it once at the end.
+    """
+    if not getattr(_in_batch, "v", False):
+        gc.collect()
+        force_mlx_cleanup()
+
+def _write_json(path, obj):
+    """
+    Write `obj` as indented JSON, using orjson's C encoder when it is installed.
+    """
+    if orjson is not None:
+        data = orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        Path(path).write_bytes(data)
+    else:
+        Path(path).write_text(json.dumps(obj, indent=2))
+
+def _save_and_meta(image, output_path, save_kwargs, metadata_path=None, metadata_dict=None):
+    """
+    Save an upscaled image and its optional metadata sidecar. Runs on `_IO_POOL`.
     """
     try:
-        # Parse inputs
-        if not input_image:
-            return None, "Error: Input image is required"
-        
-        # Get original image dimensions
-        original_image = Image.open(input_image)
-        original_width, original_height = original_image.width, original_image.height
-        
-        # Parse upscale factor (can be scale factor like "2x" or absolute value)
-        if isinstance(upscale_factor, str) and upscale_factor.strip():
-            # Try to parse as scale factor
-            if upscale_factor.strip().lower().endswith('x'):
-                try:
-                    scale = float(upscale_factor.strip().lower().replace('x', ''))
-                    upscale_factor_int = int(scale)
-                except ValueError:
-                    upscale_factor_int = 2
-            else:
-                try:
-                    upscale_factor_int = int(float(upscale_factor))
-                except ValueError:
-                    upscale_factor_int = 2
-        else:
-            upscale_factor_int = int(upscale_factor) if upscale_factor else 2
-        
-        # Validate upscale factor
-        if upscale_factor_int not in [2, 3, 4]:
-            return None, "Error: Upscale factor must be 2, 3, or 4"
+        image.save(output_path, **save_kwargs)
+        if metadata_path:
+            _write_json(metadata_path, metadata_dict)
+        print(f"Upscaled image saved to {output_path}")
+    except Exception as e:
+        print(f"Error saving upscaled image to {output_path}: {str(e)}")
+        traceback.print_exc()
 
-        target_w = int(original_width * upscale_factor_int)
-        target_h = int(original_height * upscale_factor_int)
+def _submit_save(image, output_path, save_kwargs, metadata_path=None, metadata_dict=None):
+    """
+    Queue `_save_and_meta` on `_IO_POOL`, blocking while two saves are already in flight.
+    """
+    _IO_SLOTS.acquire()
+    try:
+        future = _IO_POOL.submit(
+            _save_and_meta, image, output_path, save_kwargs, metadata_path, metadata_dict
+        )
+    except Exception:
+        _IO_SLOTS.release()
+        raise
+    future.add_done_callback(lambda _: _IO_SLOTS.release())
+    return future
 
-        # Try high-quality Flux upscaler first
-        upscaled_image = None
-        status_detail = None
-        flux_model = _get_upscale_model()
+def _clamp_webp_effort(webp_effort):
+    """
+    Clamp the libwebp `method` (0 = fastest encode, 6 = smallest file) to its valid range.
+    """
+    try:
+        return min(6, max(0, int(webp_effort)))
+    except (TypeError, ValueError):
+        return DEFAULT_WEBP_EFFORT
 
-        if flux_model:
-            try:
-                generated = flux_model.generate_image(
+def _make_saver(output_format, webp_effort=DEFAULT_WEBP_EFFORT):
+    """
+    Return (extension, PIL save kwargs) for `output_format`. Resolve this once per
+    call or batch and pass it down rather than re-branching for every image.
+    """
+    if output_format == "PNG":
+        return "png", {"format": "PNG"}
+    if output_format == "JPEG":
+        # Full-resolution chroma keeps upscaled detail; optimize/progressive shrink the file
+        return "jpg", {"format": "JPEG", "quality": 95, "subsampling": 0, "optimize": True, "progressive": True}
+    # WebP
+    return "webp", {"format": "WebP", "quality": 90, "method": _clamp_webp_effort(webp_effort)}
+
+def _upscale_one(
+    input_image, upscale_factor_int, output_format, metadata, upscaler,
+    saver=None, decoded_image=None,
+):
+    """
+    Upscale and save a single image with an already-resolved upscaler.
+    `upscaler` may be None, in which case the PIL fallback is used. No MLX
+    cleanup happens here so batch callers can run it once at the end.
+    `saver` is the result of `_make_saver` (defaults to one for `output_format`).
+    Pass `decoded_image` when the RGB pixels of `input_image` are already loaded.
+    """
+    # Decode once and reuse the pixels for dimensions, fallback resize and metadata
+    if decoded_image is not None:
+        original_image = decoded_image
+    else:
+        with Image.open(input_image) as source:
+            original_image = source.convert("RGB")
+    original_width, original_height = original_image.width, original_image.height
+
+    # Keep oversized inputs from producing an output that cannot fit in memory
+    source_image = _fit_to_output_budget(original_image, upscale_factor_int)
+    target_w = int(source_image.width * upscale_factor_int)
+    target_h = int(source_image.height * upscale_factor_int)
+
+    # Try high-quality Flux upscaler first
+    upscaled_image = None
+    status_detail = None
+
+    if upscaler:
+        try:
+            if UPSCALE_TILE > 0 and source_image.width * source_image.height > UPSCALE_TILE * UPSCALE_TILE * 2:
+                upscaled_image = _tiled_upscale(source_image, upscale_factor_int, upscaler)
+                status_detail = "Flux ControlNet upscaler, tiled"
+            else:
+                generated = upscaler.generate_image(
                     seed=int(time.time()),
                     prompt="High quality detailed image",
                     controlnet_image_path=input_image,
@@ -126,64 +403,85 @@ def upscale_image_gradio(
                 )
                 upscaled_image = generated.image
                 status_detail = "Flux ControlNet upscaler"
-            except Exception as exc:  # noqa: BLE001
-                status_detail = f"Upscaler unavailable, falling back to PIL resize: {exc}"
-                print(status_detail)
-                upscaled_image = None
+        except Exception as exc:  # noqa: BLE001
+            status_detail = f"Upscaler unavailable, falling back to PIL resize: {exc}"
+            print(status_detail)
+            upscaled_image = None
 
+    if upscaled_image is None:
+        print(f"Upscaling image with factor {upscale_factor_int}x using PIL")
+        upscaled_image = upscale_image(source_image, upscale_factor_int)
         if upscaled_image is None:
-            print(f"Upscaling image with factor {upscale_factor_int}x using PIL")
-            upscaled_image = upscale_image(input_image, upscale_factor_int)
-            if upscaled_image is None:
-                return None, "Error: Failed to upscale image"
-            status_detail = status_detail or "PIL LANCZOS resize"
-            
-        # Save the upscaled image
-        timestamp = int(time.time())
-        
-        # Determine file extension
-        if output_format == "PNG":
-            ext = "png"
-            save_kwargs = {"format": "PNG"}
-        elif output_format == "JPEG":
-            ext = "jpg"
-            save_kwargs = {"format": "JPEG", "quality": 95}
-        else:  # WebP
-            ext = "webp"
-            save_kwargs = {"format": "WebP", "quality": 95}
-            
-        filename = f"upscaled_{upscale_factor_int}x_{timestamp}.{ext}"
-        output_path = os.path.join(OUTPUT_DIR, filename)
-        upscaled_image.save(output_path, **save_kwargs)
-        
-        # Save metadata if requested
-        if metadata:
-            metadata_path = os.path.join(OUTPUT_DIR, f"upscaled_{upscale_factor_int}x_{timestamp}.json")
-            
-            # Get original image info
-            original_image = Image.open(input_image)
-            
-            metadata_dict = {
-                "original_width": original_image.width,
-                "original_height": original_image.height,
-                "upscaled_width": upscaled_image.width,
-                "upscaled_height": upscaled_image.height,
-                "upscale_factor": upscale_factor_int,
-                "output_format": output_format,
-                "generation_time": str(time.ctime()),
-                "original_file": os.path.basename(input_image)
-            }
-            with open(metadata_path, "w") as f:
-                json.dump(metadata_dict, f, indent=2)
-                
-        print(f"Upscaled image saved to {output_path}")
+            return None, "Error: Failed to upscale image"
+        status_detail = status_detail or "PIL LANCZOS resize"
+
+    if source_image is not original_image:
+        status_detail = f"{status_detail}; input reduced to {source_image.width}x{source_image.height} to stay under {UPSCALE_MAX_MP:g} MP"
+
+    # Save the upscaled image
+    now = time.time()
+    timestamp = f"{int(now)}_{next(_OUTPUT_SEQ)}"
+    generation_time = datetime.fromtimestamp(now).isoformat(timespec="seconds")
+    
+    # Determine file extension
+    ext, save_kwargs = saver or _make_saver(output_format)
         
-        # Return both the image and a success message
-        info_message = f"Successfully upscaled image {upscale_factor_int}x to {upscaled_image.width}x{upscaled_image.height}"
-        if status_detail:
-            info_message = f"{info_message} ({status_detail})"
-        return upscaled_image, info_message
+    filename = f"upscaled_{upscale_factor_int}x_{timestamp}.{ext}"
+    output_path = f"{_OUTPUT_DIR_B}{filename}"
+    
+    # Save metadata if requested
+    metadata_path = None
+    metadata_dict = None
+    if metadata:
+        metadata_path = f"{_OUTPUT_DIR_B}upscaled_{upscale_factor_int}x_{timestamp}.json"
         
+        metadata_dict = {
+            "original_width": original_width,
+            "original_height": original_height,
+            "upscaled_width": upscaled_image.width,
+            "upscaled_height": upscaled_image.height,
+            "upscale_factor": upscale_factor_int,
+            "output_format": output_format,
+            "generation_time": generation_time,
+            "original_file": os.fspath(input_image).rsplit(os.sep, 1)[-1]
+        }
+
+    # Hand the encode to the IO pool so the image is returned without waiting on disk
+    _submit_save(upscaled_image.copy(), output_path, save_kwargs, metadata_path, metadata_dict)
+    print(f"Saving upscaled image to {output_path}")
+    
+    # Return both the image and a success message
+    info_message = f"Successfully upscaled image {upscale_factor_int}x to {upscaled_image.width}x{upscaled_image.height}"
+    if status_detail:
+        info_message = f"{info_message} ({status_detail})"
+    return upscaled_image, info_message
+
+def upscale_image_gradio(
+    input_image, upscale_factor, output_format, metadata, webp_effort=DEFAULT_WEBP_EFFORT,
+    upscaler_precision=None,
+):
+    """
+    Upscale an image using the Flux ControlNet upscaler when available,
+    falling back to high-quality PIL resize when not.
+    """
+    try:
+        # Parse inputs
+        if not input_image:
+            return None, "Error: Input image is required"
+
+        # Parse upscale factor (can be scale factor like "2x" or absolute value)
+        upscale_factor_int = _parse_upscale_factor(upscale_factor)
+
+        # Validate upscale factor
+        if upscale_factor_int not in [2, 3, 4]:
+            return None, "Error: Upscale factor must be 2, 3, or 4"
+
+        with _using_upscale_model(upscaler_precision) as upscaler:
+            return _upscale_one(
+                input_image, upscale_factor_int, output_format, metadata, upscaler,
+                saver=_make_saver(output_format, webp_effort),
+            )
+
     except Exception as e:
         print(f"Error in upscaling: {str(e)}")
         import traceback
@@ -192,15 +490,15 @@ def upscale_image_gradio(
         
     finally:
         # Cleanup
-        gc.collect()
-        force_mlx_cleanup()
+        _cleanup_unless_batched()
 
 # Expose this module as `upscale_manager`
 import sys as _sys
 upscale_manager = _sys.modules[__name__]
 
 def upscale_with_custom_dimensions_gradio(
-    input_image, target_width, target_height, output_format, metadata
+    input_image, target_width, target_height, output_format, metadata,
+    webp_effort=DEFAULT_WEBP_EFFORT,
 ):
     """
     Upscale an image to custom dimensions using scale factors or absolute values.
@@ -209,13 +507,26 @@ def upscale_with_custom_dimensions_gradio(
         if not input_image:
             return None, "Error: Input image is required"
         
-        # Get original image dimensions
-        original_image = Image.open(input_image)
+        # Decode once; the same image feeds the dimension math and the upscaler
+        with Image.open(input_image) as source:
+            original_image = source.convert("RGB")
         original_width, original_height = original_image.width, original_image.height
         
         # Parse target dimensions
         final_width = parse_scale_factor(target_width, original_width)
         final_height = parse_scale_factor(target_height, original_height)
+
+        # Cap the requested output to the megapixel budget
+        budget_note = None
+        shrink = _budget_shrink(final_width, final_height)
+        if shrink < 1.0:
+            capped_width = max(1, int(final_width * shrink))
+            capped_height = max(1, int(final_height * shrink))
+            budget_note = (
+                f"reduced from {final_width}x{final_height} to stay under {UPSCALE_MAX_MP:g} MP"
+            )
+            print(f"Warning: target {budget_note}; using {capped_width}x{capped_height}")
+            final_width, final_height = capped_width, capped_height
         
         # Calculate effective scale factor
         scale_x = final_width / original_width
@@ -234,36 +545,38 @@ def upscale_with_custom_dimensions_gradio(
         
         # Upscale the image
         print(f"Upscaling image with factor {upscale_factor_int}x to target {final_width}x{final_height}")
-        upscaled_image = upscale_image(input_image, upscale_factor_int)
+        # The intermediate integer-factor pass must respect the budget as well
+        upscaled_image = upscale_image(
+            _fit_to_output_budget(original_image, upscale_factor_int), upscale_factor_int
+        )
         
         if upscaled_image is None:
             return None, "Error: Failed to upscale image"
         
-        # Resize to exact target dimensions if needed
+        # Resize to exact target dimensions if needed (bicubic on the MLX device)
         if upscaled_image.width != final_width or upscaled_image.height != final_height:
-            upscaled_image = upscaled_image.resize((final_width, final_height), Image.Resampling.LANCZOS)
+            pixels = mx.array(np.asarray(upscaled_image))
+            # Drop the PIL copy; only the uint8 device array is kept while resampling
+            upscaled_image = None
+            upscaled_image = _resize_on_device(pixels, (final_width, final_height))
+            del pixels
         
         # Save the upscaled image
-        timestamp = int(time.time())
+        now = time.time()
+        timestamp = f"{int(now)}_{next(_OUTPUT_SEQ)}"
+        generation_time = datetime.fromtimestamp(now).isoformat(timespec="seconds")
         
         # Determine file extension
-        if output_format == "PNG":
-            ext = "png"
-            save_kwargs = {"format": "PNG"}
-        elif output_format == "JPEG":
-            ext = "jpg"
-            save_kwargs = {"format": "JPEG", "quality": 95}
-        else:  # WebP
-            ext = "webp"
-            save_kwargs = {"format": "WebP", "quality": 95}
+        ext, save_kwargs = _make_saver(output_format, webp_effort)
             
         filename = f"upscaled_custom_{final_width}x{final_height}_{timestamp}.{ext}"
-        output_path = os.path.join(OUTPUT_DIR, filename)
-        upscaled_image.save(output_path, **save_kwargs)
+        output_path = f"{_OUTPUT_DIR_B}{filename}"
         
         # Save metadata if requested
+        metadata_path = None
+        metadata_dict = None
         if metadata:
-            metadata_path = os.path.join(OUTPUT_DIR, f"upscaled_custom_{final_width}x{final_height}_{timestamp}.json")
+            metadata_path = f"{_OUTPUT_DIR_B}upscaled_custom_{final_width}x{final_height}_{timestamp}.json"
             
             metadata_dict = {
                 "original_width": original_width,
@@ -275,16 +588,18 @@ def upscale_with_custom_dimensions_gradio(
                 "effective_scale": effective_scale,
                 "upscale_factor_used": upscale_factor_int,
                 "output_format": output_format,
-                "generation_time": str(time.ctime()),
-                "original_file": os.path.basename(input_image)
+                "generation_time": generation_time,
+                "original_file": os.fspath(input_image).rsplit(os.sep, 1)[-1]
             }
-            with open(metadata_path, "w") as f:
-                json.dump(metadata_dict, f, indent=2)
-                
-        print(f"Upscaled image saved to {output_path}")
+
+        # Hand the encode to the IO pool so the image is returned without waiting on disk
+        _submit_save(upscaled_image.copy(), output_path, save_kwargs, metadata_path, metadata_dict)
+        print(f"Saving upscaled image to {output_path}")
         
         # Return both the image and a success message
         info_message = f"Successfully upscaled image to {upscaled_image.width}x{upscaled_image.height}"
+        if budget_note:
+            info_message = f"{info_message} ({budget_note})"
         return upscaled_image, info_message
         
     except Exception as e:
@@ -295,11 +610,60 @@ def upscale_with_custom_dimensions_gradio(
         
     finally:
         # Cleanup
-        gc.collect()
-        force_mlx_cleanup()
+        _cleanup_unless_batched()
+
+def _group_by_size(image_paths):
+    """
+    Return indices into `image_paths` ordered so that images sharing the same
+    (width, height) are adjacent. Only headers are read, pixels are not decoded.
+    """
+    buckets = {}
+    for idx, image_path in enumerate(image_paths):
+        try:
+            with Image.open(image_path) as img:
+                size = img.size
+        except Exception:
+            # Unreadable files get their own bucket; the error surfaces when processed.
+            size = None
+        buckets.setdefault(size, []).append(idx)
+    return [idx for indices in buckets.values() for idx in indices]
+
+def _prefetch_decoded(image_paths, order, maxsize=2):
+    """
+    Decode `image_paths` in `order` on a background thread and yield
+    (idx, image, error) tuples, keeping at most `maxsize` images decoded ahead.
+    """
+    decode_q = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def _producer():
+        for idx in order:
+            try:
+                with Image.open(image_paths[idx]) as source:
+                    item = (idx, source.convert("RGB"), None)
+            except Exception as e:
+                item = (idx, None, e)
+            # Poll so an abandoned consumer does not leave this thread blocked forever.
+            while not stop.is_set():
+                try:
+                    decode_q.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            if stop.is_set():
+                return
+
+    producer = threading.Thread(target=_producer, name="upscale-decode", daemon=True)
+    producer.start()
+    try:
+        for _ in order:
+            yield decode_q.get()
+    finally:
+        stop.set()
 
 def batch_upscale_gradio(
-    input_images, upscale_factor, output_format, metadata
+    input_images, upscale_factor, output_format, metadata, webp_effort=DEFAULT_WEBP_EFFORT,
+    upscaler_precision=None,
 ):
     """
     Batch upscale multiple images.
@@ -308,25 +672,53 @@ def batch_upscale_gradio(
         if not input_images:
             return [], "Error: No images provided"
             
-        upscaled_images = []
-        errors = []
+        upscale_factor_int = _parse_upscale_factor(upscale_factor)
+        if upscale_factor_int not in [2, 3, 4]:
+            return [], "Error: Upscale factor must be 2, 3, or 4"
+
+        # Resolve the upscaler once so its weights are shared by the whole batch,
+        # and hold it for the whole batch so no other request can swap it out.
+        with _using_upscale_model(upscaler_precision) as upscaler:
+            saver = _make_saver(output_format, webp_effort)
+
+            # Run same-sized inputs back to back so the upscaler keeps working on one
+            # shape at a time instead of reallocating buffers for every image.
+            if len(input_images) > 1:
+                order = _group_by_size(input_images)
+            else:
+                order = [0]
+
+            results = {}
+            errors = {}
         
-        for idx, image_path in enumerate(input_images):
-            try:
-                print(f"Processing image {idx+1}/{len(input_images)}")
+            # Decoding runs one image ahead on its own thread and saving happens on
+            # _IO_POOL (at most two in flight), so only the upscale itself stays on
+            # this (single MLX) thread.
+            decoded = _prefetch_decoded(input_images, order)
+            for position, (idx, image, decode_error) in enumerate(decoded):
+                image_path = input_images[idx]
+                try:
+                    print(f"Processing image {position+1}/{len(input_images)}")
+                    if decode_error is not None:
+                        raise decode_error
                 
-                # Upscale individual image
-                upscaled, message = upscale_image_gradio(
-                    image_path, upscale_factor, output_format, metadata
-                )
+                    # Upscale individual image
+                    upscaled, message = _upscale_one(
+                        image_path, upscale_factor_int, output_format, metadata, upscaler,
+                        saver=saver, decoded_image=image,
+                    )
                 
-                if upscaled:
-                    upscaled_images.append(upscaled)
-                else:
-                    errors.append(f"Image {idx+1}: {message}")
+                    if upscaled:
+                        results[idx] = upscaled
+                    else:
+                        errors[idx] = f"Image {idx+1}: {message}"
                     
-            except Exception as e:
-                errors.append(f"Image {idx+1}: {str(e)}")
+                except Exception as e:
+                    errors[idx] = f"Image {idx+1}: {str(e)}"
+
+        # Report results in the order the images were submitted
+        upscaled_images = [results[idx] for idx in sorted(results)]
+        errors = [errors[idx] for idx in sorted(errors)]
                 
         if upscaled_images:
             success_msg = f"Successfully upscaled {len(upscaled_images)} image(s)"
@@ -342,6 +734,11 @@ def batch_upscale_gradio(
         traceback.print_exc()
         return [], f"Error: {str(e)}"
 
+    finally:
+        # Cleanup once for the whole batch
+        gc.collect()
+        force_mlx_cleanup()
+
 def _resolve_image_path(input_image):
     """
     Accepts a PIL image, file-like object, or path-like input and returns a tuple of
@@ -439,33 +836,40 @@ def upscale_batch_gradio(
         return []
 
     results = []
-    for idx, img_input in enumerate(image_files):
-        if progress_callback:
-            try:
-                progress_callback(idx)
-            except Exception:
-                pass
-
-        img_path, tmp_path = _resolve_image_path(img_input)
-        try:
-            with Image.open(img_path) as img:
-                target_w = parse_scale_factor(scale_factor, img.width)
-                target_h = parse_scale_factor(scale_factor, img.height)
-
-            upscaled, _ = upscale_with_custom_dimensions_gradio(
-                input_image=img_path,
-                target_width=target_w,
-                target_height=target_h,
-                output_format="PNG",
-                metadata=save_metadata,
-            )
-            if upscaled:
-                results.append(upscaled)
-        finally:
-            if tmp_path and os.path.exists(tmp_path):
+    # Per-image calls skip their MLX cleanup; it runs once after the loop.
+    _in_batch.v = True
+    try:
+        for idx, img_input in enumerate(image_files):
+            if progress_callback:
                 try:
-                    os.remove(tmp_path)
-                except OSError:
+                    progress_callback(idx)
+                except Exception:
                     pass
 
+            img_path, tmp_path = _resolve_image_path(img_input)
+            try:
+                with Image.open(img_path) as img:
+                    target_w = parse_scale_factor(scale_factor, img.width)
+                    target_h = parse_scale_factor(scale_factor, img.height)
+
+                upscaled, _ = upscale_with_custom_dimensions_gradio(
+                    input_image=img_path,
+                    target_width=target_w,
+                    target_height=target_h,
+                    output_format="PNG",
+                    metadata=save_metadata,
+                )
+                if upscaled:
+                    results.append(upscaled)
+            finally:
+                if tmp_path and os.path.exists(tmp_path):
+                    try:
+                        os.remove(tmp_path)
+                    except OSError:
+                        pass
+    finally:
+        _in_batch.v = False
+        gc.collect()
+        force_mlx_cleanup()
+
     return results